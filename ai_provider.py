@@ -2,9 +2,16 @@
 AI Provider Integrations: Unified interface for cloud + local (Ollama) LLMs.
 All functions return normalized responses with consistent error handling.
 """
+import asyncio
 import httpx
+import ijson
+import orjson
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_random_exponential
 import ollama  # Official Ollama client
-from typing import Dict, Any, Optional
+from ollama import AsyncClient
+from enum import IntEnum
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, AsyncIterator, Iterator
 from config import settings
 from fastapi import HTTPException
 import logging
@@ -14,52 +21,336 @@ logger = logging.getLogger(__name__)
 # Timeout configuration (prevents hanging requests)
 TIMEOUT_CONFIG = httpx.Timeout(30.0, connect=10.0)
 
-# ===== CLOUD PROVIDERS (unchanged from previous implementation) =====
+# Connection pool limits (keep-alive sockets are reused across requests)
+POOL_LIMITS = httpx.Limits(
+    max_keepalive_connections=20,
+    max_connections=100,
+    keepalive_expiry=30.0
+)
 
-async def call_openai(
+# Shared HTTP client for all cloud providers (avoids a TCP+TLS handshake per request).
+# HTTP/2 (negotiated via ALPN, requires `h2`) multiplexes concurrent requests
+# over one connection per provider. Closed by the shutdown handler in main.py.
+_CLIENT = httpx.AsyncClient(
+    timeout=TIMEOUT_CONFIG,
+    transport=httpx.AsyncHTTPTransport(retries=1, limits=POOL_LIMITS, http2=True)
+)
+
+# Provider origins probed at startup so the pool holds warm TLS sessions
+WARMUP_URLS = [
+    "https://api.openai.com/v1/",
+    "https://api.anthropic.com/v1/",
+    "https://generativelanguage.googleapis.com/",
+]
+# Short per-probe timeout so unreachable providers (air-gapped hosts) give up fast
+WARMUP_TIMEOUT = httpx.Timeout(2.0)
+
+async def warm_up_connections() -> None:
+    """
+    Open keep-alive connections to each cloud provider ahead of the first request.
+    Response status is irrelevant (only the handshake matters), so errors are ignored.
+    """
+    results = await asyncio.gather(
+        *[_CLIENT.head(url, timeout=WARMUP_TIMEOUT) for url in WARMUP_URLS],
+        return_exceptions=True
+    )
+    for url, result in zip(WARMUP_URLS, results):
+        if isinstance(result, Exception):
+            logger.warning("Connection warm-up failed for %s: %s", url, result)
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client and release pooled connections"""
+    await _CLIENT.aclose()
+
+# Static per-provider auth headers/params (built once, not per request)
+_OPENAI_HEADERS = {
+    "Authorization": f"Bearer {settings.openai_api_key}",
+    "Content-Type": "application/json"
+}
+_ANTHROPIC_HEADERS = {
+    "x-api-key": settings.anthropic_api_key,
+    "anthropic-version": "2023-06-01",
+    "content-type": "application/json"
+}
+_GEMINI_HEADERS = {"Content-Type": "application/json"}
+_GEMINI_PARAMS = {"key": settings.gemini_api_key}
+_GEMINI_STREAM_PARAMS = {**_GEMINI_PARAMS, "alt": "sse"}
+
+# Bodies below this size (or without a Content-Length) are parsed whole with
+# orjson, which is faster at any size for plain completions; only larger ones
+# (e.g. logprobs-heavy) are scanned with ijson so only the answer is materialized
+PARTIAL_PARSE_THRESHOLD = 256 * 1024
+
+class _AsyncBodyReader:
+    """Minimal async file-like adapter over a streamed response body (for ijson)"""
+    
+    def __init__(self, response: httpx.Response):
+        self._chunks = response.aiter_bytes()
+    
+    async def read(self, n: int = -1) -> bytes:
+        if n == 0:
+            return b""
+        return await anext(self._chunks, b"")
+
+def _walk(data: Any, keys: List[str]) -> Iterator[Any]:
+    """Yield every value at an ijson-style path ("a.item.b") in document order, like ijson.items"""
+    if not keys:
+        yield data
+        return
+    key, rest = keys[0], keys[1:]
+    if key == "item":
+        if isinstance(data, list):
+            for element in data:
+                yield from _walk(element, rest)
+    elif isinstance(data, dict) and key in data:
+        yield from _walk(data[key], rest)
+
+async def _extract_text(response: httpx.Response, path: str) -> str:
+    """Read only the first string at `path` from a streamed JSON response body"""
+    content_length = response.headers.get("content-length")
+    if content_length is None or int(content_length) < PARTIAL_PARSE_THRESHOLD:
+        for text in _walk(orjson.loads(await response.aread()), path.split(".")):
+            return text
+        raise ValueError(f"Response is missing '{path}'")
+    
+    reader = _AsyncBodyReader(response)
+    async for text in ijson.items(reader, path):
+        # Drain (without parsing) the rest so the connection can be reused
+        while await reader.read():
+            pass
+        return text
+    raise ValueError(f"Response is missing '{path}'")
+
+# Transient upstream statuses worth retrying on the live connection
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+RETRY_MAX_WAIT = 8.0  # Seconds
+
+def _is_transient(exc: BaseException) -> bool:
+    return isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code in RETRY_STATUS_CODES
+
+_backoff = wait_random_exponential(multiplier=0.5, max=RETRY_MAX_WAIT)
+
+def _wait_retry_after(retry_state) -> float:
+    """Honor a numeric Retry-After header (capped), else exponential backoff with jitter"""
+    exc = retry_state.outcome.exception()
+    retry_after = exc.response.headers.get("Retry-After") if isinstance(exc, httpx.HTTPStatusError) else None
+    if retry_after:
+        try:
+            return min(float(retry_after), RETRY_MAX_WAIT)
+        except ValueError:
+            pass  # HTTP-date form; fall back to backoff
+    return _backoff(retry_state)
+
+@retry(
+    retry=retry_if_exception(_is_transient),
+    stop=stop_after_attempt(3),
+    wait=_wait_retry_after,
+    reraise=True
+)
+async def _post_for_text(
+    name: str,
+    url: str,
+    path: str,
+    payload: Dict[str, Any],
+    headers: Dict[str, str],
+    params: Optional[Dict[str, str]] = None
+) -> str:
+    """POST a JSON payload and return the string at `path` (retries 429/5xx)"""
+    async with _CLIENT.stream(
+        "POST",
+        url,
+        headers=headers,
+        params=params,
+        content=orjson.dumps(payload)
+    ) as response:
+        logger.debug("%s responded over %s", name, response.http_version)
+        if response.is_error:
+            await response.aread()
+        response.raise_for_status()
+        return await _extract_text(response, path)
+
+# Per-provider concurrency caps: excess requests queue instead of tripping rate limits
+_SEMAPHORES = {
+    "openai": asyncio.Semaphore(settings.openai_max_concurrency),
+    "anthropic": asyncio.Semaphore(settings.anthropic_max_concurrency),
+    "gemini": asyncio.Semaphore(settings.gemini_max_concurrency),
+    "ollama": asyncio.Semaphore(settings.ollama_max_concurrency)
+}
+
+# ===== CLOUD PROVIDERS (table-driven: one request/error path for all) =====
+
+@lru_cache(maxsize=16)
+def _gemini_url(model: str, method: str = "generateContent") -> str:
+    """Build (once per model/method) the Gemini endpoint URL"""
+    # Gemini API expects model name without "gemini-" prefix in URL
+    api_model = model.replace("gemini-", "") if model.startswith("gemini-") else model
+    return f"https://generativelanguage.googleapis.com/v1beta/models/{api_model}:{method}"
+
+def _upstream_error_message(exc: httpx.HTTPStatusError) -> str:
+    """Best-effort error message from an upstream error body (may be HTML or non-standard JSON)"""
+    try:
+        error = orjson.loads(exc.response.content).get("error")
+    except (orjson.JSONDecodeError, AttributeError):
+        error = None
+    if isinstance(error, dict) and error.get("message"):
+        return str(error["message"])
+    if isinstance(error, str) and error:
+        return error
+    # Truncate so an HTML error page is not echoed back whole
+    return exc.response.text.strip()[:200] or str(exc)
+
+def _cloud_error(label: str, exc: Exception) -> HTTPException:
+    """Map any failure of a cloud call onto an HTTPException (shared by all providers)"""
+    if isinstance(exc, HTTPException):
+        # Already mapped (e.g. in-stream error events)
+        return exc
+    if isinstance(exc, httpx.HTTPStatusError):
+        return HTTPException(
+            status_code=exc.response.status_code,
+            detail=f"{label} API Error: {_upstream_error_message(exc)}"
+        )
+    return HTTPException(
+        status_code=502,
+        detail=f"{label} request failed: {str(exc)}"
+    )
+
+async def _iter_sse_json(response: httpx.Response) -> AsyncIterator[Dict[str, Any]]:
+    """Parse `data:` lines of a server-sent event stream into JSON objects"""
+    async for line in response.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if not data:
+            continue
+        if data == "[DONE]":
+            break
+        yield orjson.loads(data)
+
+def _stream_error(label: str, event: Dict[str, Any]) -> HTTPException:
+    """Turn an in-stream provider error event into an HTTPException"""
+    error = event.get("error") or {}
+    message = error.get("message") if isinstance(error, dict) else str(error)
+    return HTTPException(
+        status_code=502,
+        detail=f"{label} API Error: {message or 'stream error'}"
+    )
+
+def _openai_stream_text(event: Dict[str, Any]) -> Optional[str]:
+    if "error" in event:
+        raise _stream_error("OpenAI", event)
+    choices = event.get("choices") or [{}]
+    return choices[0].get("delta", {}).get("content")
+
+def _anthropic_stream_text(event: Dict[str, Any]) -> Optional[str]:
+    # e.g. {"type": "error", "error": {"type": "overloaded_error", ...}}
+    if event.get("type") == "error":
+        raise _stream_error("Anthropic", event)
+    if event.get("type") == "content_block_delta":
+        return event.get("delta", {}).get("text")
+    return None
+
+def _gemini_stream_text(event: Dict[str, Any]) -> Optional[str]:
+    if "error" in event:
+        raise _stream_error("Gemini", event)
+    candidates = event.get("candidates") or [{}]
+    parts = candidates[0].get("content", {}).get("parts", [])
+    return "".join(part.get("text", "") for part in parts)
+
+# Per-provider request shape: endpoint, auth, payload builder and answer path,
+# plus the streaming endpoint and per-event text extractor
+_PROVIDER_SPEC: Dict[str, Dict[str, Any]] = {
+    "openai": {
+        "label": "OpenAI",
+        "default_model": settings.default_openai_model,
+        "url": lambda model: "https://api.openai.com/v1/chat/completions",
+        "headers": _OPENAI_HEADERS,
+        "params": None,
+        "payload": lambda prompt, model, max_tokens, temperature: {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+            "temperature": temperature
+        },
+        "path": "choices.item.message.content",
+        "stream_url": lambda model: "https://api.openai.com/v1/chat/completions",
+        "stream_params": None,
+        "stream_fields": {"stream": True},
+        "stream_text": _openai_stream_text
+    },
+    "anthropic": {
+        "label": "Anthropic",
+        "default_model": settings.default_anthropic_model,
+        "url": lambda model: "https://api.anthropic.com/v1/messages",
+        "headers": _ANTHROPIC_HEADERS,
+        "params": None,
+        "payload": lambda prompt, model, max_tokens, temperature: {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max(1, min(max_tokens, 4096)),
+            "temperature": temperature
+        },
+        "path": "content.item.text",
+        "stream_url": lambda model: "https://api.anthropic.com/v1/messages",
+        "stream_params": None,
+        "stream_fields": {"stream": True},
+        "stream_text": _anthropic_stream_text
+    },
+    "gemini": {
+        "label": "Gemini",
+        "default_model": settings.default_gemini_model,
+        "url": _gemini_url,
+        "headers": _GEMINI_HEADERS,
+        "params": _GEMINI_PARAMS,
+        "payload": lambda prompt, model, max_tokens, temperature: {
+            "contents": [{"parts": [{"text": prompt}]}],
+            "generationConfig": {
+                "maxOutputTokens": max_tokens,
+                "temperature": temperature
+            }
+        },
+        "path": "candidates.item.content.parts.item.text",
+        "stream_url": lambda model: _gemini_url(model, "streamGenerateContent"),
+        "stream_params": _GEMINI_STREAM_PARAMS,
+        "stream_fields": {},
+        "stream_text": _gemini_stream_text
+    }
+}
+
+async def _call_cloud(
+    name: str,
     prompt: str,
     model: Optional[str] = None,
     max_tokens: int = 500,
     temperature: float = 0.7
 ) -> str:
-    """Call OpenAI API with normalized request/response"""
-    api_key = settings.openai_api_key
-    model = model or settings.default_openai_model
-    
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
+    """Call a cloud provider described in _PROVIDER_SPEC with normalized request/response"""
+    spec = _PROVIDER_SPEC[name]
+    model = model or spec["default_model"]
+    payload = spec["payload"](prompt, model, max_tokens, temperature)
     
-    payload = {
-        "model": model,
-        "messages": [{"role": "user", "content": prompt}],
-        "max_tokens": max_tokens,
-        "temperature": temperature
-    }
-    
-    try:
-        async with httpx.AsyncClient(timeout=TIMEOUT_CONFIG) as client:
-            response = await client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers=headers,
-                json=payload
+    async with _SEMAPHORES[name]:
+        try:
+            text = await _post_for_text(
+                spec["label"],
+                spec["url"](model),
+                spec["path"],
+                payload,
+                headers=spec["headers"],
+                params=spec["params"]
             )
-            response.raise_for_status()
-            data = response.json()
-            return data["choices"][0]["message"]["content"].strip()
-    
-    except httpx.HTTPStatusError as e:
-        error_detail = e.response.json().get("error", {}).get("message", str(e))
-        raise HTTPException(
-            status_code=e.response.status_code,
-            detail=f"OpenAI API Error: {error_detail}"
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=502,
-            detail=f"OpenAI request failed: {str(e)}"
-        )
+            return text.strip()
+        
+        except Exception as e:
+            raise _cloud_error(spec["label"], e)
+
+async def call_openai(
+    prompt: str,
+    model: Optional[str] = None,
+    max_tokens: int = 500,
+    temperature: float = 0.7
+) -> str:
+    """Call OpenAI API with normalized request/response"""
+    return await _call_cloud("openai", prompt, model, max_tokens, temperature)
 
 async def call_anthropic(
     prompt: str,
@@ -68,45 +359,7 @@ async def call_anthropic(
     temperature: float = 0.7
 ) -> str:
     """Call Anthropic API with normalized request/response"""
-    api_key = settings.anthropic_api_key
-    model = model or settings.default_anthropic_model
-    max_tokens = max(1, min(max_tokens, 4096))
-    
-    headers = {
-        "x-api-key": api_key,
-        "anthropic-version": "2023-06-01",
-        "content-type": "application/json"
-    }
-    
-    payload = {
-        "model": model,
-        "messages": [{"role": "user", "content": prompt}],
-        "max_tokens": max_tokens,
-        "temperature": temperature
-    }
-    
-    try:
-        async with httpx.AsyncClient(timeout=TIMEOUT_CONFIG) as client:
-            response = await client.post(
-                "https://api.anthropic.com/v1/messages",
-                headers=headers,
-                json=payload
-            )
-            response.raise_for_status()
-            data = response.json()
-            return data["content"][0]["text"].strip()
-    
-    except httpx.HTTPStatusError as e:
-        error_detail = e.response.json().get("error", {}).get("message", str(e))
-        raise HTTPException(
-            status_code=e.response.status_code,
-            detail=f"Anthropic API Error: {error_detail}"
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=502,
-            detail=f"Anthropic request failed: {str(e)}"
-        )
+    return await _call_cloud("anthropic", prompt, model, max_tokens, temperature)
 
 async def call_gemini(
     prompt: str,
@@ -115,44 +368,51 @@ async def call_gemini(
     temperature: float = 0.7
 ) -> str:
     """Call Google Gemini API with normalized request/response"""
-    api_key = settings.gemini_api_key
-    model_name = model or settings.default_gemini_model
-    # Gemini API expects model name without "gemini-" prefix in URL
-    api_model = model_name.replace("gemini-", "") if model_name.startswith("gemini-") else model_name
-    
-    payload = {
-        "contents": [{"parts": [{"text": prompt}]}],
-        "generationConfig": {
-            "maxOutputTokens": max_tokens,
-            "temperature": temperature
-        }
-    }
-    
-    try:
-        async with httpx.AsyncClient(timeout=TIMEOUT_CONFIG) as client:
-            response = await client.post(
-                f"https://generativelanguage.googleapis.com/v1beta/models/{api_model}:generateContent",
-                params={"key": api_key},
-                json=payload
-            )
-            response.raise_for_status()
-            data = response.json()
-            return data["candidates"][0]["content"]["parts"][0]["text"].strip()
-    
-    except httpx.HTTPStatusError as e:
-        error_detail = e.response.json().get("error", {}).get("message", str(e))
-        raise HTTPException(
-            status_code=e.response.status_code,
-            detail=f"Gemini API Error: {error_detail}"
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=502,
-            detail=f"Gemini request failed: {str(e)}"
-        )
+    return await _call_cloud("gemini", prompt, model, max_tokens, temperature)
 
 # ===== OLLAMA PROVIDER (NEW - Local LLMs) =====
 
+# Async Ollama client (keeps its own connection pool to the local server)
+_OLLAMA = AsyncClient(host=settings.ollama_host)
+
+# Last result of the background Ollama probe (optimistic until the first probe)
+_OLLAMA_HEALTHY: bool = settings.is_ollama_available
+OLLAMA_PROBE_TIMEOUT = 5.0  # Seconds
+
+def is_ollama_healthy() -> bool:
+    """Whether the most recent probe reached the Ollama server"""
+    return _OLLAMA_HEALTHY
+
+async def probe_ollama() -> bool:
+    """Ping the Ollama server once and record the result"""
+    global _OLLAMA_HEALTHY
+    try:
+        await asyncio.wait_for(_OLLAMA.list(), timeout=OLLAMA_PROBE_TIMEOUT)
+        healthy = True
+    except Exception:
+        healthy = False
+    if healthy != _OLLAMA_HEALTHY:
+        logger.warning("Ollama at %s is now %s", settings.ollama_host, "up" if healthy else "down")
+    _OLLAMA_HEALTHY = healthy
+    return healthy
+
+def _ollama_unreachable() -> HTTPException:
+    """Record a failed connection right away (without waiting for the next probe)"""
+    global _OLLAMA_HEALTHY
+    if _OLLAMA_HEALTHY:
+        logger.warning("Ollama at %s is now down", settings.ollama_host)
+    _OLLAMA_HEALTHY = False
+    return HTTPException(
+        status_code=503,
+        detail=f"Ollama server not running at {settings.ollama_host}. Start with: ollama serve"
+    )
+
+async def monitor_ollama(interval: float) -> None:
+    """Probe Ollama every `interval` seconds (run as a background task)"""
+    while True:
+        await probe_ollama()
+        await asyncio.sleep(interval)
+
 async def call_ollama(
     prompt: str,
     model: Optional[str] = None,
@@ -161,7 +421,7 @@ async def call_ollama(
 ) -> str:
     """
     Call Ollama (local LLM server) with normalized request/response.
-    Uses official Ollama Python client for reliability.
+    Uses the official Ollama async client so generation doesn't block the event loop.
     """
     if not settings.is_ollama_available:
         raise HTTPException(
@@ -169,72 +429,219 @@ async def call_ollama(
             detail="Ollama is not configured. Set OLLAMA_HOST in .env"
         )
     
+    # Fail fast instead of waiting on a connect timeout when the probe saw it down
+    if not _OLLAMA_HEALTHY:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Ollama server not running at {settings.ollama_host}. Start with: ollama serve"
+        )
+    
     model = model or settings.default_ollama_model
     
-    try:
-        # Ollama client handles connection to localhost:11434 by default
-        # We use synchronous client since Ollama's Python lib isn't async-native
-        # (Wrapped in async function for unified interface)
-        logger.info(f"Calling Ollama with model: {model}")
+    async with _SEMAPHORES["ollama"]:
+        try:
+            # Async client keeps the event loop free during local inference
+            logger.info("Calling Ollama with model: %s", model)
         
-        response = ollama.generate(
-            model=model,
-            prompt=prompt,
-            options={
-                "temperature": temperature,
-                "num_predict": max_tokens
-            }
-        )
+            response = await _OLLAMA.generate(
+                model=model,
+                prompt=prompt,
+                stream=False,
+                options={
+                    "temperature": temperature,
+                    "num_predict": max_tokens
+                }
+            )
         
-        return response["response"].strip()
-    
-    except ollama.ResponseError as e:
-        # Handle Ollama-specific errors (model not found, server down, etc.)
-        if "model not found" in str(e).lower():
+            return response["response"].strip()
+        
+        except (ConnectionError, httpx.ConnectError):
+            raise _ollama_unreachable()
+        except ollama.ResponseError as e:
+            # Handle Ollama-specific errors (model not found, server down, etc.)
+            if "model not found" in str(e).lower():
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Ollama model '{model}' not found. Run: ollama pull {model}"
+                )
+            elif "connection" in str(e).lower() or "refused" in str(e).lower():
+                raise _ollama_unreachable()
+            else:
+                raise HTTPException(
+                    status_code=502,
+                    detail=f"Ollama error: {str(e)}"
+                )
+        except Exception as e:
             raise HTTPException(
-                status_code=400,
-                detail=f"Ollama model '{model}' not found. Run: ollama pull {model}"
+                status_code=502,
+                detail=f"Ollama request failed: {str(e)}"
             )
-        elif "connection" in str(e).lower() or "refused" in str(e).lower():
-            raise HTTPException(
-                status_code=503,
-                detail=f"Ollama server not running at {settings.ollama_host}. Start with: ollama serve"
+
+# ===== STREAMING PROVIDERS (token-by-token output) =====
+
+async def _stream_cloud(
+    name: str,
+    prompt: str,
+    model: Optional[str] = None,
+    max_tokens: int = 500,
+    temperature: float = 0.7
+) -> AsyncIterator[str]:
+    """Stream text from a cloud provider described in _PROVIDER_SPEC"""
+    spec = _PROVIDER_SPEC[name]
+    model = model or spec["default_model"]
+    payload = {**spec["payload"](prompt, model, max_tokens, temperature), **spec["stream_fields"]}
+    
+    async with _SEMAPHORES[name]:
+        try:
+            async with _CLIENT.stream(
+                "POST",
+                spec["stream_url"](model),
+                headers=spec["headers"],
+                params=spec["stream_params"],
+                content=orjson.dumps(payload)
+            ) as response:
+                if response.is_error:
+                    await response.aread()
+                response.raise_for_status()
+                async for event in _iter_sse_json(response):
+                    text = spec["stream_text"](event)
+                    if text:
+                        yield text
+        
+        except Exception as e:
+            raise _cloud_error(spec["label"], e)
+
+async def call_openai_stream(
+    prompt: str,
+    model: Optional[str] = None,
+    max_tokens: int = 500,
+    temperature: float = 0.7
+) -> AsyncIterator[str]:
+    """Stream OpenAI completion text as it is generated"""
+    async for text in _stream_cloud("openai", prompt, model, max_tokens, temperature):
+        yield text
+
+async def call_anthropic_stream(
+    prompt: str,
+    model: Optional[str] = None,
+    max_tokens: int = 500,
+    temperature: float = 0.7
+) -> AsyncIterator[str]:
+    """Stream Anthropic message text as it is generated"""
+    async for text in _stream_cloud("anthropic", prompt, model, max_tokens, temperature):
+        yield text
+
+async def call_gemini_stream(
+    prompt: str,
+    model: Optional[str] = None,
+    max_tokens: int = 500,
+    temperature: float = 0.7
+) -> AsyncIterator[str]:
+    """Stream Google Gemini output text as it is generated"""
+    async for text in _stream_cloud("gemini", prompt, model, max_tokens, temperature):
+        yield text
+
+async def call_ollama_stream(
+    prompt: str,
+    model: Optional[str] = None,
+    max_tokens: int = 500,
+    temperature: float = 0.7
+) -> AsyncIterator[str]:
+    """Stream Ollama generation text as it is produced"""
+    if not settings.is_ollama_available:
+        raise HTTPException(
+            status_code=503,
+            detail="Ollama is not configured. Set OLLAMA_HOST in .env"
+        )
+    
+    # Fail fast instead of waiting on a connect timeout when the probe saw it down
+    if not _OLLAMA_HEALTHY:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Ollama server not running at {settings.ollama_host}. Start with: ollama serve"
+        )
+    
+    model = model or settings.default_ollama_model
+    
+    async with _SEMAPHORES["ollama"]:
+        try:
+            logger.info("Streaming from Ollama with model: %s", model)
+        
+            chunks = await _OLLAMA.generate(
+                model=model,
+                prompt=prompt,
+                stream=True,
+                options={
+                    "temperature": temperature,
+                    "num_predict": max_tokens
+                }
             )
-        else:
+            async for chunk in chunks:
+                if chunk["response"]:
+                    yield chunk["response"]
+        
+        except (ConnectionError, httpx.ConnectError):
+            raise _ollama_unreachable()
+        except ollama.ResponseError as e:
+            if "model not found" in str(e).lower():
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Ollama model '{model}' not found. Run: ollama pull {model}"
+                )
+            elif "connection" in str(e).lower() or "refused" in str(e).lower():
+                raise _ollama_unreachable()
+            else:
+                raise HTTPException(
+                    status_code=502,
+                    detail=f"Ollama error: {str(e)}"
+                )
+        except Exception as e:
             raise HTTPException(
                 status_code=502,
-                detail=f"Ollama error: {str(e)}"
+                detail=f"Ollama request failed: {str(e)}"
             )
-    except Exception as e:
-        raise HTTPException(
-            status_code=502,
-            detail=f"Ollama request failed: {str(e)}"
-        )
 
 # ===== PROVIDER REGISTRY =====
-PROVIDER_MAP = {
-    "openai": call_openai,
-    "anthropic": call_anthropic,
-    "gemini": call_gemini,
-    "ollama": call_ollama  # NEW!
-}
-
-def get_provider_function(provider: str):
-    """Safely retrieve provider function with validation"""
-    provider = provider.lower()
+class Provider(IntEnum):
+    """Supported providers; each value indexes the dispatch tuples below"""
+    OPENAI = 0
+    ANTHROPIC = 1
+    GEMINI = 2
+    OLLAMA = 3
     
-    if provider not in PROVIDER_MAP:
+    def __str__(self) -> str:
+        return self.name.lower()
+
+# Positional dispatch tables (order must match Provider values)
+_PROVIDER_FUNCS = (call_openai, call_anthropic, call_gemini, call_ollama)
+_STREAM_PROVIDER_FUNCS = (call_openai_stream, call_anthropic_stream, call_gemini_stream, call_ollama_stream)
+
+# Name-keyed views kept for logging/introspection
+PROVIDER_MAP = {str(p): _PROVIDER_FUNCS[p] for p in Provider}
+STREAM_PROVIDER_MAP = {str(p): _STREAM_PROVIDER_FUNCS[p] for p in Provider}
+
+def parse_provider(value: Any) -> Provider:
+    """Map a case-insensitive provider name onto Provider (ValueError if unsupported)"""
+    if isinstance(value, Provider):
+        return value
+    name = value.strip().upper() if isinstance(value, str) else None
+    if name not in Provider.__members__:
         available = list(PROVIDER_MAP.keys())
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported provider: '{provider}'. Available: {available}"
-        )
-    
+        raise ValueError(f"Unsupported provider: '{value}'. Available: {available}")
+    return Provider[name]
+
+def get_provider_function(provider: Provider):
+    """Retrieve provider function by enum index (checks Ollama availability)"""
     # Special check for Ollama availability
-    if provider == "ollama" and not settings.is_ollama_available:
+    if provider is Provider.OLLAMA and not settings.is_ollama_available:
         raise HTTPException(
             status_code=400,
             detail="Ollama provider requested but not configured. Set OLLAMA_HOST in .env"
         )
     
-    return PROVIDER_MAP[provider]
\ No newline at end of file
+    return _PROVIDER_FUNCS[provider]
+
+def get_provider_stream_function(provider: Provider):
+    """Retrieve the streaming variant of a provider function (same validation)"""
+    get_provider_function(provider)
+    return _STREAM_PROVIDER_FUNCS[provider]
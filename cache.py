@@ -0,0 +1,66 @@
+"""
+Response Cache: In-process LRU + TTL cache for deterministic AI requests.
+Only low-temperature (or explicitly opted-in) requests are cached, since
+sampled completions are expected to differ between calls.
+"""
+import asyncio
+import hashlib
+import orjson
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from config import settings
+
+# key -> (expires_at, response_text), ordered oldest -> most recently used
+_CACHE: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+_LOCK = asyncio.Lock()
+
+def is_cacheable(temperature: Optional[float], force: bool = False) -> bool:
+    """
+    Cache only (near-)deterministic requests unless the client opts in.
+    A null temperature means "provider default", which isn't known to be deterministic.
+    """
+    if force:
+        return True
+    return temperature is not None and temperature <= settings.response_cache_max_temperature
+
+def make_key(
+    provider: str,
+    model: Optional[str],
+    prompt: str,
+    max_tokens: Optional[int],
+    temperature: Optional[float]
+) -> str:
+    """SHA-256 of the canonicalized request"""
+    canonical = orjson.dumps(
+        {
+            "p": provider,
+            "m": model,
+            "prompt": prompt,
+            "mx": max_tokens,
+            "t": None if temperature is None else round(temperature, 3)
+        },
+        option=orjson.OPT_SORT_KEYS
+    )
+    return hashlib.sha256(canonical).hexdigest()
+
+async def get(key: str) -> Optional[str]:
+    """Return a cached response, or None if missing/expired"""
+    async with _LOCK:
+        entry = _CACHE.get(key)
+        if entry is None:
+            return None
+        expires_at, response_text = entry
+        if expires_at < time.monotonic():
+            del _CACHE[key]
+            return None
+        _CACHE.move_to_end(key)
+        return response_text
+
+async def put(key: str, response_text: str) -> None:
+    """Store a response and evict the least recently used entries over capacity"""
+    async with _LOCK:
+        _CACHE[key] = (time.monotonic() + settings.response_cache_ttl, response_text)
+        _CACHE.move_to_end(key)
+        while len(_CACHE) > settings.response_cache_max_entries:
+            _CACHE.popitem(last=False)
@@ -2,7 +2,8 @@
 Configuration module: Loads environment variables with Ollama support.
 Ollama settings are optional (local inference doesn't require API keys).
 """
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from functools import cached_property
 from typing import List, Optional
 import os
 
@@ -17,28 +18,50 @@ class Settings(BaseSettings):
     # Ollama configuration (optional - local inference)
     ollama_host: str = "http://localhost:11434"  # Default Ollama endpoint
     default_ollama_model: str = "llama3.2:3b"
+    ollama_probe_interval: float = 15.0  # Seconds between background health probes
     
     # Default models for cloud providers
     default_openai_model: str = "gpt-4o-mini"
     default_anthropic_model: str = "claude-3-5-sonnet-20241022"
     default_gemini_model: str = "gemini-1.5-flash"
     
+    # Max in-flight requests per provider, PER WORKER PROCESS: the effective cap
+    # is this value x worker count, so divide the provider's limit accordingly
+    # (Ollama should match local GPU capacity since it can't truly parallelize)
+    openai_max_concurrency: int = 50
+    anthropic_max_concurrency: int = 25
+    gemini_max_concurrency: int = 25
+    ollama_max_concurrency: int = 2
+    
+    # Response cache (deterministic requests only)
+    response_cache_ttl: float = 300.0  # Seconds
+    response_cache_max_entries: int = 10000
+    response_cache_max_temperature: float = 0.05
+    
+    # Server launcher (`python main.py`)
+    env: str = "dev"  # "prod" disables reload and starts multiple workers
+    workers: Optional[int] = None  # Defaults to CPU count in prod
+    
     # Security: CORS configuration
     allowed_origins: str = "http://localhost:3000,http://localhost:8000"
     
-    @property
+    @cached_property
     def cors_origins_list(self) -> List[str]:
-        """Convert comma-separated string to list for CORS middleware"""
+        """Convert comma-separated string to list for CORS middleware (computed once)"""
         return [origin.strip() for origin in self.allowed_origins.split(",") if origin.strip()]
     
-    @property
+    @cached_property
     def is_ollama_available(self) -> bool:
-        """Check if Ollama should be enabled (host configured)"""
+        """Check if Ollama should be enabled (host configured; computed once)"""
         return bool(self.ollama_host.strip())
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
+    # Frozen: settings never change after startup, so they are hashable and
+    # the cached properties above can never go stale
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        case_sensitive=False,
+        frozen=True
+    )
 
 # Initialize settings (cloud keys required, Ollama optional)
 try:
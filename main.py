@@ -7,18 +7,25 @@ Features:
 - Structured error handling
 - Request validation
 """
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import Optional
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field, BeforeValidator, ConfigDict, WithJsonSchema
+from typing import Optional, AsyncIterator, List, Union, Annotated
+import asyncio
+import orjson
 import ai_provider
-from  ai_provider import get_provider_function, PROVIDER_MAP
+import cache
+from  ai_provider import get_provider_function, get_provider_stream_function, PROVIDER_MAP, Provider, parse_provider
 from config import settings
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
-# Configure logging
+# Configure logging (writes directly until startup_event moves I/O off the event loop)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+_log_listener: Optional[QueueListener] = None
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -38,14 +45,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Provider names are parsed straight into the Provider enum (documented as strings)
+ProviderField = Annotated[
+    Provider,
+    BeforeValidator(parse_provider),
+    WithJsonSchema({"type": "string", "enum": list(PROVIDER_MAP.keys())})
+]
+
 # Request/Response Models (Pydantic validation)
 class AIRequest(BaseModel):
     """Unified request schema for all providers"""
-    provider: str = Field(..., description="AI provider name (openai, anthropic, gemini)")
+    # Unknown fields and oversized strings are rejected inside pydantic-core
+    model_config = ConfigDict(
+        extra="forbid",
+        str_strip_whitespace=True,
+        str_max_length=10000,
+        validate_assignment=False
+    )
+    
+    provider: ProviderField = Field(..., description="AI provider name (openai, anthropic, gemini, ollama)")
     prompt: str = Field(..., min_length=1, max_length=10000, description="User prompt")
     model: Optional[str] = Field(None, description="Model name (uses default if omitted)")
     max_tokens: Optional[int] = Field(500, ge=1, le=4096, description="Max response tokens")
     temperature: Optional[float] = Field(0.7, ge=0.0, le=2.0, description="Sampling temperature")
+    stream: bool = Field(False, description="Stream tokens as server-sent events")
 
 class AIResponse(BaseModel):
     """Normalized response schema"""
@@ -54,17 +77,117 @@ class AIResponse(BaseModel):
     response: str
     prompt_tokens: Optional[int] = None
     completion_tokens: Optional[int] = None
+    cached: bool = False
+
+class AIBatchRequest(BaseModel):
+    """Several chat requests executed concurrently"""
+    model_config = ConfigDict(extra="forbid")
+    
+    requests: List[AIRequest] = Field(..., min_length=1, max_length=20, description="Requests to fan out (streaming is ignored)")
+
+class AIBatchError(BaseModel):
+    """Per-item failure inside a batch (other items are unaffected)"""
+    provider: str
+    status_code: int
+    detail: str
+
+class AIBatchResponse(BaseModel):
+    """Batch results, in the same order as the submitted requests"""
+    results: List[Union[AIResponse, AIBatchError]]
+
+async def _sse_events(first_chunk: Optional[str], chunks: AsyncIterator[str]) -> AsyncIterator[bytes]:
+    """Frame provider text chunks as server-sent events"""
+    try:
+        if first_chunk is not None:
+            yield b"data: " + orjson.dumps({"text": first_chunk}) + b"\n\n"
+        async for chunk in chunks:
+            yield b"data: " + orjson.dumps({"text": chunk}) + b"\n\n"
+    except HTTPException as e:
+        # Headers are already sent, so report mid-stream failures in-band
+        yield b"event: error\ndata: " + orjson.dumps({"detail": e.detail}) + b"\n\n"
+        return
+    yield b"data: [DONE]\n\n"
+
+async def _stream_response(request: AIRequest) -> StreamingResponse:
+    """
+    Start a provider stream and wrap it in a StreamingResponse.
+    The first chunk is awaited up front so connection/auth errors still
+    surface as regular HTTP error responses.
+    """
+    stream_func = get_provider_stream_function(request.provider)
+    chunks = stream_func(
+        prompt=request.prompt,
+        model=request.model,
+        max_tokens=request.max_tokens,
+        temperature=request.temperature
+    )
+    try:
+        first_chunk = await chunks.__anext__()
+    except StopAsyncIteration:
+        first_chunk = None
+    return StreamingResponse(_sse_events(first_chunk, chunks), media_type="text/event-stream")
+
+def _response_body(request: AIRequest, response_text: str, cached: bool = False) -> dict:
+    """
+    Build the AIResponse payload as a plain dict.
+    Endpoints return it pre-serialized with orjson, so FastAPI skips
+    response_model validation (the model only documents the schema).
+    """
+    return {
+        "provider": str(request.provider),
+        "model": request.model or "default",
+        "response": response_text,
+        "prompt_tokens": None,
+        "completion_tokens": None,
+        "cached": cached
+    }
+
+async def _dispatch(request: AIRequest, provider_func, force_cache: bool = False) -> dict:
+    """Run one non-streaming request, serving it from the response cache when allowed"""
+    # Serve identical deterministic requests from the response cache
+    cache_key = None
+    if cache.is_cacheable(request.temperature, force=force_cache):
+        cache_key = cache.make_key(
+            str(request.provider),
+            request.model,
+            request.prompt,
+            request.max_tokens,
+            request.temperature
+        )
+        cached_text = await cache.get(cache_key)
+        if cached_text is not None:
+            logger.info("Cache hit for %s", request.provider)
+            return _response_body(request, cached_text, cached=True)
+    
+    # Call provider API (handles its own error raising)
+    response_text = await provider_func(
+        prompt=request.prompt,
+        model=request.model,
+        max_tokens=request.max_tokens,
+        temperature=request.temperature
+    )
+    
+    if cache_key is not None:
+        await cache.put(cache_key, response_text)
+    
+    # Return normalized response
+    return _response_body(request, response_text)
 
 @app.post("/ai/chat", response_model=AIResponse, summary="Route to any AI provider")
-async def chat_endpoint(request: AIRequest):
+async def chat_endpoint(
+    request: AIRequest,
+    x_ai_router_cache: Optional[str] = Header(None, description="Set to 1 to cache this request regardless of temperature")
+):
     """
     Unified endpoint for all AI providers.
     
     How it works:
     1. Validates provider name against supported list
-    2. Routes to appropriate provider function
-    3. Returns normalized response
-    4. Handles all errors with proper HTTP status codes
+    2. Streams server-sent events when "stream": true (bypasses the cache)
+    3. Serves deterministic requests (low temperature or X-AI-Router-Cache: 1) from cache
+    4. Routes to appropriate provider function
+    5. Returns normalized response
+    6. Handles all errors with proper HTTP status codes
     
     Example request:
     {
@@ -74,38 +197,72 @@ async def chat_endpoint(request: AIRequest):
     }
     """
     try:
-        # Get provider function (validates provider name)
-        provider_func = get_provider_function(request.provider.lower())
+        # Get provider function (name already parsed into Provider by AIRequest)
+        provider_func = get_provider_function(request.provider)
         
         # Log request (without sensitive data)
-        logger.info(f"Routing to {request.provider} | Model: {request.model or 'default'} | Tokens: {request.max_tokens}")
+        logger.info("Routing to %s | Model: %s | Tokens: %s", request.provider, request.model or "default", request.max_tokens)
         
-        # Call provider API (handles its own error raising)
-        response_text = await provider_func(
-            prompt=request.prompt,
-            model=request.model,
-            max_tokens=request.max_tokens,
-            temperature=request.temperature
-        )
+        # Forward tokens as they arrive instead of buffering the full completion
+        if request.stream:
+            return await _stream_response(request)
         
-        # Return normalized response
-        return AIResponse(
-            provider=request.provider,
-            model=request.model or "default",
-            response=response_text
-        )
+        body = await _dispatch(request, provider_func, force_cache=x_ai_router_cache == "1")
+        return Response(content=orjson.dumps(body), media_type="application/json")
     
     except HTTPException:
         # Re-raise provider-specific HTTP exceptions
         raise
     except Exception as e:
         # Catch-all for unexpected errors (never expose stack traces in prod!)
-        logger.error(f"Unexpected error: {str(e)}", exc_info=True)
+        logger.error("Unexpected error: %s", e, exc_info=True)
         raise HTTPException(
             status_code=500,
             detail="Internal server error processing AI request"
         )
 
+@app.post("/ai/batch", response_model=AIBatchResponse, summary="Fan out to several AI providers concurrently")
+async def batch_endpoint(
+    batch: AIBatchRequest,
+    x_ai_router_cache: Optional[str] = Header(None, description="Set to 1 to cache these requests regardless of temperature")
+):
+    """
+    Run multiple chat requests in parallel (e.g. to compare providers).
+    
+    Wall-clock time is that of the slowest request rather than the sum.
+    A failing item is reported as an error entry without failing the batch.
+    
+    Example request:
+    {
+      "requests": [
+        {"provider": "openai", "prompt": "Define entropy"},
+        {"provider": "ollama", "prompt": "Define entropy"}
+      ]
+    }
+    """
+    async def run(request: AIRequest) -> dict:
+        provider_func = get_provider_function(request.provider)
+        return await _dispatch(request, provider_func, force_cache=x_ai_router_cache == "1")
+    
+    logger.info("Batch of %d requests", len(batch.requests))
+    
+    # Build every coroutine first, then await them together
+    outcomes = await asyncio.gather(
+        *[run(request) for request in batch.requests],
+        return_exceptions=True
+    )
+    
+    results = []
+    for request, outcome in zip(batch.requests, outcomes):
+        if isinstance(outcome, HTTPException):
+            results.append({"provider": str(request.provider), "status_code": outcome.status_code, "detail": str(outcome.detail)})
+        elif isinstance(outcome, Exception):
+            logger.error("Unexpected batch error: %s", outcome, exc_info=outcome)
+            results.append({"provider": str(request.provider), "status_code": 500, "detail": "Internal server error processing AI request"})
+        else:
+            results.append(outcome)
+    return Response(content=orjson.dumps({"results": results}), media_type="application/json")
+
 @app.get("/health")
 async def health_check():
     """Health check with provider availability status"""
@@ -113,7 +270,7 @@ async def health_check():
         "openai": True,
         "anthropic": True,
         "gemini": True,
-        "ollama": settings.is_ollama_available
+        "ollama": settings.is_ollama_available and ai_provider.is_ollama_healthy()
     }
     return {
         "status": "healthy",
@@ -121,19 +278,64 @@ async def health_check():
         "ollama_host": settings.ollama_host if settings.is_ollama_available else None
     }
 
+# Background tasks started on startup (connection warm-up, Ollama health probe)
+_warm_up: Optional[asyncio.Task] = None
+_ollama_monitor: Optional[asyncio.Task] = None
+
 # Startup event (optional but useful)
 @app.on_event("startup")
 async def startup_event():
+    # Handlers only enqueue records; a background thread writes them through
+    # the handlers configured above (restored on shutdown)
+    global _log_listener
+    root = logging.getLogger()
+    log_queue = queue.SimpleQueue()
+    _log_listener = QueueListener(log_queue, *root.handlers, respect_handler_level=True)
+    root.handlers = [QueueHandler(log_queue)]
+    _log_listener.start()
     logger.info("🚀 Unified AI Router started")
-    logger.info(f"SupportedContent: {list(PROVIDER_MAP.keys())}")
-    logger.info(f"CORS enabled for: {settings.cors_origins_list}")
+    logger.info("SupportedContent: %s", list(PROVIDER_MAP.keys()))
+    logger.info("CORS enabled for: %s", settings.cors_origins_list)
+    # Pre-open TLS connections in the background so the first user request
+    # skips the handshake without startup waiting on slow/unreachable providers
+    global _warm_up
+    _warm_up = asyncio.create_task(ai_provider.warm_up_connections())
+    # Keep Ollama's real reachability up to date for /health and fast failures
+    if settings.is_ollama_available:
+        global _ollama_monitor
+        _ollama_monitor = asyncio.create_task(
+            ai_provider.monitor_ollama(settings.ollama_probe_interval)
+        )
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    for task in (_warm_up, _ollama_monitor):
+        if task is not None:
+            task.cancel()
+    # Release pooled keep-alive connections to the cloud providers
+    await ai_provider.close_http_client()
+    logger.info("🛑 Unified AI Router stopped")
+    # Flush queued log records, join the writer thread and write directly again
+    if _log_listener is not None:
+        _log_listener.stop()
+        logging.getLogger().handlers = list(_log_listener.handlers)
 
 if __name__ == "__main__":
+    import os
+    import sys
     import uvicorn
+    
+    # ENV=prod: one worker per CPU (or WORKERS); otherwise single auto-reloading worker.
+    # Concurrency caps and the response cache are per worker (see .env.example).
+    is_prod = settings.env.lower() == "prod"
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,  # Disable in production!
+        reload=not is_prod,
+        workers=(settings.workers or os.cpu_count() or 1) if is_prod else None,
+        # libuv event loop + C HTTP parser (uvloop is unavailable on Windows)
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
         log_level="info"
     )
\ No newline at end of file
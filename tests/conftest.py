@@ -0,0 +1,12 @@
+"""
+Shared test setup: dummy API keys so `config.Settings()` loads without a .env,
+and the repo root on sys.path so the top-level modules import.
+"""
+import os
+import sys
+
+os.environ.setdefault("OPENAI_API_KEY", "test-openai-key")
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-anthropic-key")
+os.environ.setdefault("GEMINI_API_KEY", "test-gemini-key")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,183 @@
+"""Tests for provider response parsing (uses httpx.MockTransport, no network)"""
+import asyncio
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from tenacity import stop_after_attempt
+
+import ai_provider
+import main
+
+
+def mock_client(monkeypatch, handler):
+    monkeypatch.setattr(ai_provider, "_CLIENT", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+
+def sse(*events: str) -> str:
+    return "".join(f"data: {event}\n\n" for event in events)
+
+
+async def collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+@pytest.mark.parametrize("stream_func, body, message", [
+    (
+        ai_provider.call_openai_stream,
+        sse('{"choices":[{"delta":{"content":"Hel"}}]}', '{"error":{"message":"server overloaded"}}'),
+        "OpenAI API Error: server overloaded"
+    ),
+    (
+        ai_provider.call_anthropic_stream,
+        "event: content_block_delta\n"
+        + sse('{"type":"content_block_delta","delta":{"type":"text_delta","text":"Hel"}}')
+        + "event: error\n"
+        + sse('{"type":"error","error":{"type":"overloaded_error","message":"Overloaded"}}'),
+        "Anthropic API Error: Overloaded"
+    ),
+    (
+        ai_provider.call_gemini_stream,
+        sse('{"candidates":[{"content":{"parts":[{"text":"Hel"}]}}]}', '{"error":{"code":503,"message":"unavailable"}}'),
+        "Gemini API Error: unavailable"
+    ),
+])
+def test_stream_error_events_raise(monkeypatch, stream_func, body, message):
+    mock_client(monkeypatch, lambda request: httpx.Response(200, text=body))
+
+    chunks = []
+
+    async def scenario():
+        async for chunk in stream_func("hi"):
+            chunks.append(chunk)
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(scenario())
+    assert chunks == ["Hel"]
+    assert exc_info.value.detail == message
+
+
+def test_stream_error_event_is_reported_in_band(monkeypatch):
+    body = sse('{"choices":[{"delta":{"content":"Hel"}}]}', '{"error":{"message":"server overloaded"}}')
+    mock_client(monkeypatch, lambda request: httpx.Response(200, text=body))
+
+    response = TestClient(main.app).post("/ai/chat", json={"provider": "openai", "prompt": "hi", "stream": True})
+    assert response.status_code == 200
+    assert 'event: error\ndata: {"detail":"OpenAI API Error: server overloaded"}' in response.text
+    assert "[DONE]" not in response.text
+
+
+@pytest.mark.parametrize("stream_func, url, body, sends_stream_flag", [
+    (
+        ai_provider.call_openai_stream,
+        "https://api.openai.com/v1/chat/completions",
+        sse('{"choices":[{"delta":{"role":"assistant"}}]}', '{"choices":[{"delta":{"content":"Hi"}}]}',
+            '{"choices":[{"delta":{"content":" there"}}]}', "[DONE]"),
+        True
+    ),
+    (
+        ai_provider.call_anthropic_stream,
+        "https://api.anthropic.com/v1/messages",
+        sse('{"type":"message_start"}', '{"type":"content_block_delta","delta":{"type":"text_delta","text":"Hi"}}',
+            '{"type":"content_block_delta","delta":{"type":"text_delta","text":" there"}}', '{"type":"message_stop"}'),
+        True
+    ),
+    (
+        ai_provider.call_gemini_stream,
+        "https://generativelanguage.googleapis.com/v1beta/models/1.5-flash:streamGenerateContent",
+        sse('{"candidates":[{"content":{"parts":[{"text":"Hi"}]}}]}', '{"candidates":[{"content":{"parts":[{"text":" there"}]}}]}'),
+        False
+    ),
+])
+def test_stream_happy_path(monkeypatch, stream_func, url, body, sends_stream_flag):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, text=body)
+
+    mock_client(monkeypatch, handler)
+
+    assert asyncio.run(collect(stream_func("hi"))) == ["Hi", " there"]
+    request = requests[0]
+    assert str(request.url).split("?")[0] == url
+    assert (b'"stream":true' in request.content) is sends_stream_flag
+    if "googleapis" in url:
+        assert request.url.params["alt"] == "sse"
+
+
+@pytest.mark.parametrize("padding", [0, ai_provider.PARTIAL_PARSE_THRESHOLD])
+def test_extract_text_branches_agree(monkeypatch, padding):
+    # The first part has no "text" (e.g. a function call): both the small-body
+    # walk and the streamed ijson parse must skip it and return the first match
+    body = (
+        '{"candidates":[{"content":{"parts":[{"functionCall":{"name":"f","args":{}}},{"text":"Hi"}]}},'
+        '{"content":{"parts":[{"text":"second candidate"}]}}],'
+        f'"padding":"{"x" * padding}"}}'
+    )
+    mock_client(monkeypatch, lambda request: httpx.Response(200, text=body))
+
+    assert (len(body) < ai_provider.PARTIAL_PARSE_THRESHOLD) is (padding == 0)
+    assert asyncio.run(ai_provider.call_gemini("hi")) == "Hi"
+
+
+@pytest.mark.parametrize("padding", [0, ai_provider.PARTIAL_PARSE_THRESHOLD])
+def test_extract_text_missing_path_raises_on_both_branches(monkeypatch, padding):
+    body = f'{{"candidates":[{{"content":{{"parts":[{{"functionCall":{{}}}}]}}}}],"padding":"{"x" * padding}"}}'
+    mock_client(monkeypatch, lambda request: httpx.Response(200, text=body))
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(ai_provider.call_gemini("hi"))
+    assert exc_info.value.status_code == 502
+
+
+@pytest.mark.parametrize("status, body, detail", [
+    (503, "<html><body>Service Unavailable</body></html>", "OpenAI API Error: <html><body>Service Unavailable</body></html>"),
+    (502, '{"error": "bad gateway"}', "OpenAI API Error: bad gateway"),
+    (504, '["unexpected"]', 'OpenAI API Error: ["unexpected"]'),
+    (429, '{"error": {"message": "rate limited"}}', "OpenAI API Error: rate limited"),
+])
+def test_upstream_error_bodies_keep_status(monkeypatch, status, body, detail):
+    mock_client(monkeypatch, lambda request: httpx.Response(status, text=body))
+    # Single attempt, no backoff
+    monkeypatch.setattr(ai_provider, "_post_for_text", ai_provider._post_for_text.retry_with(stop=stop_after_attempt(1)))
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(ai_provider.call_openai("hi"))
+    assert exc_info.value.status_code == status
+    assert exc_info.value.detail == detail
+
+
+@pytest.mark.parametrize("error", [ConnectionError("Failed to connect to Ollama"), httpx.ConnectError("refused")])
+def test_ollama_connection_failure_marks_unhealthy(monkeypatch, error):
+    monkeypatch.setattr(ai_provider, "_OLLAMA_HEALTHY", True)
+
+    async def generate(**kwargs):
+        raise error
+
+    monkeypatch.setattr(ai_provider._OLLAMA, "generate", generate)
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(ai_provider.call_ollama("hi"))
+    assert exc_info.value.status_code == 503
+    assert not ai_provider.is_ollama_healthy()
+
+
+def test_extract_text_without_content_length_uses_orjson(monkeypatch):
+    body = b'{"choices":[{"message":{"content":"Hi"}}]}'
+
+    async def chunked():
+        yield body[:10]
+        yield body[10:]
+
+    def handler(request):
+        return httpx.Response(200, content=chunked())
+
+    def no_ijson(*args, **kwargs):
+        raise AssertionError("ijson used for a small chunked body")
+
+    mock_client(monkeypatch, handler)
+    monkeypatch.setattr(ai_provider.ijson, "items", no_ijson)
+
+    assert asyncio.run(ai_provider.call_openai("hi")) == "Hi"
@@ -0,0 +1,120 @@
+"""Tests for the deterministic-request response cache"""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import ai_provider
+import cache
+import main
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache._CACHE.clear()
+    yield
+    cache._CACHE.clear()
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Replace every provider with a stub that records its kwargs"""
+    recorded = []
+
+    async def fake_provider(**kwargs):
+        recorded.append(kwargs)
+        return f"answer {len(recorded)}"
+
+    monkeypatch.setattr(ai_provider, "_PROVIDER_FUNCS", (fake_provider,) * 4)
+    return recorded
+
+
+@pytest.fixture
+def client():
+    # No context manager: skip startup (network warm-up, Ollama probe)
+    return TestClient(main.app)
+
+
+def test_is_cacheable_thresholds():
+    assert cache.is_cacheable(0.0)
+    assert not cache.is_cacheable(0.7)
+    assert not cache.is_cacheable(None)
+    assert cache.is_cacheable(0.7, force=True)
+    assert cache.is_cacheable(None, force=True)
+
+
+def test_make_key_accepts_null_temperature_and_max_tokens():
+    key = cache.make_key("openai", None, "hi", None, None)
+    assert key == cache.make_key("openai", None, "hi", None, None)
+    assert key != cache.make_key("openai", None, "hi", None, 0.0)
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+
+    async def scenario():
+        await cache.put("k", "v")
+        assert await cache.get("k") == "v"
+        now[0] += cache.settings.response_cache_ttl + 1
+        assert await cache.get("k") is None
+        assert "k" not in cache._CACHE
+
+    asyncio.run(scenario())
+
+
+def test_lru_eviction(monkeypatch):
+    monkeypatch.setattr(cache, "settings", cache.settings.model_copy(update={"response_cache_max_entries": 2}))
+
+    async def scenario():
+        await cache.put("a", "1")
+        await cache.put("b", "2")
+        assert await cache.get("a") == "1"  # "a" becomes most recently used
+        await cache.put("c", "3")
+        assert await cache.get("b") is None
+        assert await cache.get("a") == "1"
+        assert await cache.get("c") == "3"
+
+    asyncio.run(scenario())
+
+
+def test_low_temperature_requests_are_served_from_cache(client, calls):
+    body = {"provider": "openai", "prompt": "hi", "temperature": 0}
+    first = client.post("/ai/chat", json=body).json()
+    second = client.post("/ai/chat", json=body).json()
+    assert first["cached"] is False
+    assert second == {**first, "cached": True}
+    assert len(calls) == 1
+
+
+def test_high_temperature_requests_bypass_cache(client, calls):
+    body = {"provider": "openai", "prompt": "hi", "temperature": 0.9}
+    client.post("/ai/chat", json=body)
+    assert client.post("/ai/chat", json=body).json()["cached"] is False
+    assert len(calls) == 2
+
+
+def test_force_header_caches_high_temperature(client, calls):
+    body = {"provider": "openai", "prompt": "hi", "temperature": 0.9}
+    headers = {"X-AI-Router-Cache": "1"}
+    client.post("/ai/chat", json=body, headers=headers)
+    assert client.post("/ai/chat", json=body, headers=headers).json()["cached"] is True
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize("headers", [{}, {"X-AI-Router-Cache": "1"}])
+def test_null_temperature_on_chat(client, calls, headers):
+    response = client.post("/ai/chat", json={"provider": "openai", "prompt": "hi", "temperature": None}, headers=headers)
+    assert response.status_code == 200
+    assert calls[0]["temperature"] is None
+
+
+@pytest.mark.parametrize("headers", [{}, {"X-AI-Router-Cache": "1"}])
+def test_null_temperature_on_batch(client, calls, headers):
+    response = client.post(
+        "/ai/batch",
+        json={"requests": [{"provider": "openai", "prompt": "hi", "temperature": None}]},
+        headers=headers
+    )
+    assert response.status_code == 200
+    assert response.json()["results"][0]["response"] == "answer 1"